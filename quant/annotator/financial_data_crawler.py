@@ -1,6 +1,9 @@
 from logging import Logger
-from urllib.request import urlopen
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 
 
 class FinancialDataCrawler(object):
@@ -11,8 +14,27 @@ class FinancialDataCrawler(object):
     logger (Logger): python built-in logger
     """
 
+    #: 인스턴스를 종목마다 만들더라도 커넥션풀을 공유하도록 클래스 변수로 둠
+    _session = None
+
     def __init__(self, logger: Logger = Logger(__name__)) -> None:
         self.logger = logger
+        self._prices = dict()
+        self.session = self._get_session()
+
+    @classmethod
+    def _get_session(cls) -> requests.Session:
+        if cls._session is None:
+            session = requests.Session()
+            session.mount(
+                "https://", HTTPAdapter(pool_connections=32, pool_maxsize=32)
+            )
+            session.headers.update(
+                {"Connection": "keep-alive", "Accept-Encoding": "gzip"}
+            )
+            cls._session = session
+
+        return cls._session
 
     def _check_redirection(self, bs_obj):
         """To check rediction due to not existing ticker
@@ -32,8 +54,8 @@ class FinancialDataCrawler(object):
         """
 
         URL = "https://finance.naver.com/item/main.nhn?code={}".format(corp_code)
-        res = urlopen(URL).read().decode("cp949")
-        bs_obj = BeautifulSoup(res, "html.parser")
+        res = self.session.get(URL, timeout=10).content.decode("cp949")
+        bs_obj = BeautifulSoup(res, "lxml")
 
         if self._check_redirection(bs_obj):
             raise ValueError("Ticker not existed")
@@ -41,6 +63,11 @@ class FinancialDataCrawler(object):
         return bs_obj
 
     def get_stock_price(self, corp_code: str) -> int:
+        """현재가를 반환합니다. (같은 종목의 재호출은 인스턴스 캐시에서 반환)"""
+
+        if corp_code in self._prices:
+            return self._prices[corp_code]
+
         self.logger.debug(f"In processing: {corp_code} stock_price crawling")
 
         try:
@@ -52,12 +79,29 @@ class FinancialDataCrawler(object):
         market_sum = bs4_obj.find("p", attrs={"class": "no_today"})
 
         try:
-            spans = market_sum.find_all("span")[1:]
-            csv = [tag.get_text() for tag in spans]
-            current_price = "".join(csv)
-            current_price = int(current_price.replace(",", ""))
-            return current_price
+            # 첫 span(class="blind")이 현재가 전체 텍스트를 담고있음
+            blind = market_sum.find("span", attrs={"class": "blind"})
+            current_price = int(blind.get_text(strip=True).replace(",", ""))
 
         except:
             self.logger.debug(f"{corp_code} was not parsed")
             return 0
+
+        self._prices[corp_code] = current_price
+        return current_price
+
+    def fetch_many(self, corp_codes: list, max_workers: int = 32) -> dict:
+        """여러 종목의 현재가를 동시에 수집합니다.
+
+        수백개 종목을 순차로 조회하면 종목당 네트워크 왕복시간을 그대로
+        기다리므로, 공유 세션 위에서 스레드풀로 겹쳐 조회합니다.
+
+        Example:
+            >>> crawler.fetch_many(["005930", "007810"])
+            {'005930': 70000, '007810': 15650}
+        """
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            prices = executor.map(self.get_stock_price, corp_codes)
+
+        return dict(zip(corp_codes, prices))
@@ -0,0 +1,71 @@
+import os
+import json
+import time
+import hashlib
+
+COLLECTOR_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.path.join(COLLECTOR_DIR, ".cache")
+
+
+class FileCache:
+    """DART 응답을 저장하는 파일기반 TTL 캐시
+
+    분기가 마감된 재무제표, 고유번호(corp_code) 목록, 발행주식수는 사실상
+    불변 데이터이므로 매 실행마다 다시 받을 필요가 없습니다. 응답을
+    `.cache/{endpoint}/{md5(key)}.json`에 아래와 같은 형태(envelope)로
+    저장해두고, TTL이 지나지 않았으면 네트워크 호출없이 반환합니다.
+
+        {"fetched_at": 1693200000.0, "ttl": 7776000, "status": "정상", "data": [...]}
+
+    status에는 DART 응답의 message를 저장합니다. 상장폐지등으로 자료가
+    없는 회사의 비정상 message도 빈 data와 함께 저장하여(네거티브 캐시)
+    반복 실행시 같은 회사를 다시 조회하지 않습니다.
+
+    Example:
+        >>> cache = FileCache()
+        >>> cache.set("finance_sheet", ("00152686", 2022, 1, "CFS"), fs, ttl=90 * 86400)
+        >>> cache.get("finance_sheet", ("00152686", 2022, 1, "CFS"))
+        [...]
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def _get_path(self, endpoint: str, key) -> str:
+        hashed_key = hashlib.md5(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, endpoint, hashed_key + ".json")
+
+    def get(self, endpoint: str, key):
+        """캐시된 값을 반환합니다. 없거나 TTL이 만료되었으면 None을 반환합니다."""
+
+        path = self._get_path(endpoint, key)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                envelope = json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - envelope["fetched_at"] > envelope["ttl"]:
+            return None
+
+        return envelope["data"]
+
+    def set(self, endpoint: str, key, value, ttl: int, status: str = "정상") -> None:
+        """값을 TTL(초)과 함께 캐시에 저장합니다."""
+
+        path = self._get_path(endpoint, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        envelope = {
+            "fetched_at": time.time(),
+            "ttl": ttl,
+            "status": status,
+            "data": value,
+        }
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(envelope, fh, ensure_ascii=False)
+
+        return
@@ -0,0 +1,37 @@
+import os
+import sys
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+COLLECTOR_DIR = os.path.dirname(TEST_DIR)
+ROOT_DIR = os.path.dirname(COLLECTOR_DIR)
+sys.path.append(ROOT_DIR)
+from collector._cache import FileCache
+
+
+def test_get_returns_cached_value(tmp_path):
+    cache = FileCache(cache_dir=str(tmp_path))
+    cache.set("finance_sheet", ("00152686", 2022, 1, "CFS"), [{"a": 1}], ttl=60)
+
+    assert cache.get("finance_sheet", ("00152686", 2022, 1, "CFS")) == [{"a": 1}]
+
+
+def test_get_returns_none_on_miss_or_expiry(tmp_path):
+    cache = FileCache(cache_dir=str(tmp_path))
+
+    assert cache.get("finance_sheet", ("missing", 2022, 1, "CFS")) is None
+
+    cache.set("finance_sheet", ("00152686", 2022, 1, "CFS"), [{"a": 1}], ttl=-1)
+    assert cache.get("finance_sheet", ("00152686", 2022, 1, "CFS")) is None
+
+
+def test_negative_cache_hit_returns_empty_data(tmp_path):
+    cache = FileCache(cache_dir=str(tmp_path))
+    cache.set(
+        "finance_sheet",
+        ("00800084", 2022, 1, "CFS"),
+        [],
+        ttl=7 * 86400,
+        status="조회된 데이타가 없습니다.",
+    )
+
+    assert cache.get("finance_sheet", ("00800084", 2022, 1, "CFS")) == []
@@ -103,6 +103,7 @@ def test_create_table(dart_collector):
         ]
     )
 
+    dart_collector.get_issued_stocks = Mock(return_value=1000)
     dart_collector.set_stock_codes = Mock()
     dart_collector.stock_codes = {
         "코리아써키트": {"dart_code": "00152686", "stock_code": "007810"},
@@ -119,6 +120,7 @@ def test_create_table(dart_collector):
         "CURRENT_LIAB",
         "NON_CURRENT_ASSET",
         "NON_CURRENT_LIAB",
+        "ISSUED_STOCK",
     ]
 
     assert expected_columns == list(result_table.columns)